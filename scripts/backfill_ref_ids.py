@@ -13,39 +13,56 @@ Usage:
 """
 
 import argparse
-import json
+import csv
 import re
 from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
 
+from paths import dump_json, list_tsv_files, load_json
+
 # Paths
-REPO_ROOT = Path(__file__).parent.parent
+REPO_ROOT = Path(__file__).parent.parent.resolve()
 DATA_DIR = REPO_ROOT / "data"
 REFERENCES_DIR = DATA_DIR / "references"
 AUDIT_PATH = REFERENCES_DIR / "extraction_audit.json"
 BIB_PATH = REFERENCES_DIR / "bibliography.json"
 UNMAPPED_OUTPUT = REFERENCES_DIR / "unmapped_sources.json"
 
-# Internal source patterns - these should NOT get ref_ids
+# I/O buffer for TSV reads/writes (64 KiB)
+TSV_BUFFER_SIZE = 1 << 16
+
+# Plain tab-separated cells: quotes are literal text, never field delimiters
+TSV_FORMAT = {'delimiter': '\t', 'quoting': csv.QUOTE_NONE, 'quotechar': None}
+
+# Internal source values - these should NOT get ref_ids. Matched against the
+# stripped, lowercased value: exact names, then prefixes, then the patterns
+# that genuinely need a regex (anchored at the start of the value).
+INTERNAL_EXACT = frozenset({
+    'estimated',
+    'computational demands analysis',
+    's&k',
+    'analysis',
+    'estimates',
+    'assumptions',
+})
+INTERNAL_PREFIXES = ('derived', 'calculated')
 INTERNAL_PATTERNS = [
-    r'^estimated$',
-    r'^computational demands analysis$',
-    r'^internal\s',
-    r'^s&k$',
-    r'^analysis$',
-    r'^derived',
-    r'^calculated',
-    r'^estimates$',
-    r'^assumptions$',
+    r'internal\s',
     r'estimates,?\s*assumptions',
 ]
 
+# Compiled once at import; the DOI pattern is applied to every source cell
+_INTERNAL_RE = re.compile('|'.join(f'(?:{p})' for p in INTERNAL_PATTERNS))
+_DOI_RE = re.compile(r'(10\.\d{4,}/[^\s]+)')
+
 
 def is_internal_source(value):
     """Check if a source value is an internal reference (not a real citation)."""
     v = value.strip().lower()
-    return any(re.match(p, v) for p in INTERNAL_PATTERNS)
+    return (v in INTERNAL_EXACT
+            or v.startswith(INTERNAL_PREFIXES)
+            or _INTERNAL_RE.match(v) is not None)
 
 
 def is_text_hash_ref(ref_id):
@@ -55,50 +72,70 @@ def is_text_hash_ref(ref_id):
 
 def load_extraction_audit():
     """Load the extraction audit JSON."""
-    with open(AUDIT_PATH) as f:
-        return json.load(f)
+    return load_json(AUDIT_PATH)
 
 
 def load_bibliography():
     """Load the bibliography JSON."""
-    with open(BIB_PATH) as f:
-        return json.load(f)
+    return load_json(BIB_PATH)
 
 
 def read_tsv(filepath):
     """Read TSV file and return header + rows."""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-
-    if not lines:
-        return [], []
-
-    header = lines[0].rstrip('\n').split('\t')
-    rows = []
-    for line in lines[1:]:
+    with open(filepath, 'r', encoding='utf-8', newline='',
+              buffering=TSV_BUFFER_SIZE) as f:
         # Preserve exact content, just split by tab
-        row = line.rstrip('\n').split('\t')
-        rows.append(row)
+        reader = csv.reader(f, **TSV_FORMAT)
+        header = next(reader, None)
+        if header is None:
+            return [], []
+        rows = list(reader)
 
     return header, rows
 
 
 def write_tsv(filepath, header, rows):
-    """Write TSV file."""
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write('\t'.join(header) + '\n')
-        for row in rows:
-            f.write('\t'.join(row) + '\n')
+    """
+    Write TSV file with a single buffered write.
+
+    Cells come from read_tsv, so they never contain tabs or newlines and
+    can be joined directly.
+    """
+    lines = ['\t'.join(header)]
+    lines.extend('\t'.join(row) for row in rows)
+    lines.append('')
+    with open(filepath, 'w', encoding='utf-8', newline='',
+              buffering=TSV_BUFFER_SIZE) as f:
+        f.write('\n'.join(lines))
+
+
+def pad_row(row, idx):
+    """Extend row in place with empty cells so that row[idx] exists."""
+    if len(row) <= idx:
+        row.extend([''] * (idx + 1 - len(row)))
 
 
 def group_extractions_by_file(extractions):
-    """Group extractions by file path, then by row number."""
-    by_file = defaultdict(lambda: defaultdict(list))
+    """
+    Group extractions by file path, then by row number (first-seen order).
+
+    Each row maps to a (valid_refs, skipped_internal) pair: ref_ids to
+    backfill, and text_* labels with their original text.
+    """
+    by_file = {}
 
     for ext in extractions:
-        filepath = ext['file']
-        row_num = ext['row']
-        by_file[filepath][row_num].append(ext)
+        valid_refs, skipped_internal = by_file.setdefault(ext['file'], {}).setdefault(
+            ext['row'], ([], [])
+        )
+        ref_id = ext['ref_id']
+        if is_text_hash_ref(ref_id):
+            skipped_internal.append({
+                'ref_id': ref_id,
+                'original': ext.get('original', '')
+            })
+        else:
+            valid_refs.append(ref_id)
 
     return by_file
 
@@ -107,6 +144,9 @@ def backfill_file(tsv_path, extractions_by_row, dry_run=False):
     """
     Backfill ref_id columns for a single TSV file.
 
+    extractions_by_row maps row number -> (valid_refs, skipped_internal),
+    as built by group_extractions_by_file.
+
     Returns: dict with statistics
     """
     header, rows = read_tsv(tsv_path)
@@ -129,7 +169,7 @@ def backfill_file(tsv_path, extractions_by_row, dry_run=False):
 
     changes = []
 
-    for row_num, extraction_list in extractions_by_row.items():
+    for row_num, (valid_refs, skipped_internal) in extractions_by_row.items():
         # Row numbers in audit are 1-indexed with header at row 1
         # So row 2 in audit = index 0 in rows list
         idx = row_num - 2
@@ -146,8 +186,7 @@ def backfill_file(tsv_path, extractions_by_row, dry_run=False):
         row = rows[idx]
 
         # Ensure row has enough columns
-        while len(row) <= ref_id_idx:
-            row.append('')
+        pad_row(row, ref_id_idx)
 
         current_ref_id = row[ref_id_idx].strip()
 
@@ -160,25 +199,10 @@ def backfill_file(tsv_path, extractions_by_row, dry_run=False):
             })
             continue
 
-        # Filter out text_* ref_ids (internal labels)
-        valid_refs = []
-        skipped_internal = []
-
-        for ext in extraction_list:
-            ref_id = ext['ref_id']
-            if is_text_hash_ref(ref_id):
-                skipped_internal.append({
-                    'ref_id': ref_id,
-                    'original': ext.get('original', '')
-                })
-            else:
-                valid_refs.append(ref_id)
-
         if not valid_refs:
             # All refs were internal - optionally populate ref_note
             if skipped_internal and ref_note_idx is not None:
-                while len(row) <= ref_note_idx:
-                    row.append('')
+                pad_row(row, ref_note_idx)
                 if not row[ref_note_idx].strip():
                     # Use original text as note
                     note_text = skipped_internal[0]['original']
@@ -215,18 +239,17 @@ def backfill_file(tsv_path, extractions_by_row, dry_run=False):
             'ref_id': primary_ref
         }
 
-        # Populate supporting_refs with additional references
+        # Populate supporting_refs with additional references; dry runs only
+        # record them, without padding the row or building the joined string
         if len(valid_refs) > 1 and supporting_refs_idx is not None:
-            while len(row) <= supporting_refs_idx:
-                row.append('')
-            supporting = ';'.join(valid_refs[1:])
             if not dry_run:
+                pad_row(row, supporting_refs_idx)
                 current_supporting = row[supporting_refs_idx].strip()
                 if current_supporting and current_supporting.lower() != 'none':
                     # Append to existing
-                    row[supporting_refs_idx] = current_supporting + ';' + supporting
+                    row[supporting_refs_idx] = ';'.join([current_supporting, *valid_refs[1:]])
                 else:
-                    row[supporting_refs_idx] = supporting
+                    row[supporting_refs_idx] = ';'.join(valid_refs[1:])
             change['supporting_refs'] = valid_refs[1:]
 
         if skipped_internal:
@@ -245,94 +268,99 @@ def backfill_file(tsv_path, extractions_by_row, dry_run=False):
     }
 
 
-def find_unmapped_sources(bibliography):
-    """
-    Find source values in TSV files that don't have bibliography entries.
-    """
-    # Build lookup indices from bibliography
-    bib_by_doi = {}
-    bib_by_url = {}
-    for entry in bibliography['references']:
-        ref_id = entry.get('id')
-        if 'DOI' in entry:
-            bib_by_doi[entry['DOI'].lower()] = ref_id
-        if 'URL' in entry:
-            bib_by_url[entry['URL'].lower()] = ref_id
+def categorize_unmapped_source(val):
+    """Classify a source value that could not be matched to the bibliography."""
+    if val.count('http') > 1 or (val.count(' ') > 3 and 'http' in val):
+        return 'multi_url'
+    elif 'doi:' in val.lower() or ('10.' in val and 'http' not in val.lower()):
+        return 'doi_format_issue'
+    elif 'http' in val.lower():
+        return 'url_not_in_bib'
+    else:
+        return 'text_reference'
 
-    unmapped = []
 
-    for tsv_file in DATA_DIR.rglob('*.tsv'):
-        if '_metadata' in str(tsv_file) or 'references' in str(tsv_file):
-            continue
+def read_tsv_header(filepath):
+    """Read only the header row of a TSV file."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return f.readline().rstrip('\n').split('\t')
 
-        try:
-            header, rows = read_tsv(tsv_file)
-        except Exception:
-            continue
 
-        # Find source-like columns
-        source_cols = []
-        for i, col in enumerate(header):
-            if col.lower() in ['source', 'doi', 'link', 'references', 'ref', 'url']:
-                source_cols.append((i, col))
+def _scan_one(tsv_file, bib_dois, bib_urls):
+    """Return unmapped source records for a single TSV file."""
+    # Peek at the header first; files without source columns are not parsed
+    try:
+        header = read_tsv_header(tsv_file)
+    except Exception:
+        return []
 
-        if not source_cols:
-            continue
+    # Find source-like columns
+    source_cols = []
+    for i, col in enumerate(header):
+        if col.lower() in ['source', 'doi', 'link', 'references', 'ref', 'url']:
+            source_cols.append((i, col))
 
-        for row_idx, row in enumerate(rows):
-            row_num = row_idx + 2  # Convert to 1-indexed with header
+    if not source_cols:
+        return []
 
-            for col_idx, col_name in source_cols:
-                if col_idx >= len(row):
-                    continue
+    unmapped = []
+    rel_path = str(tsv_file.relative_to(DATA_DIR))
 
-                val = row[col_idx].strip()
-                if not val or val.lower() in ['none', '', 'n/a', 'na']:
-                    continue
+    try:
+        with open(tsv_file, 'r', encoding='utf-8', newline='',
+                  buffering=TSV_BUFFER_SIZE) as f:
+            reader = csv.reader(f, **TSV_FORMAT)
+            next(reader, None)
 
-                # Skip internal sources
-                if is_internal_source(val):
-                    continue
+            for row_num, row in enumerate(reader, start=2):  # 1-indexed with header
+                for col_idx, col_name in source_cols:
+                    if col_idx >= len(row):
+                        continue
 
-                # Try to match
-                matched = False
-                matched_ref_id = None
+                    val = row[col_idx].strip()
+                    val_lower = val.lower()
+                    if val_lower in ('', 'none', 'n/a', 'na'):
+                        continue
 
-                # Check DOI
-                if '10.' in val:
-                    doi_match = re.search(r'10\.\d{4,}/[^\s]+', val)
-                    if doi_match:
-                        doi = doi_match.group(0).rstrip('.,;').lower()
-                        if doi in bib_by_doi:
-                            matched = True
-                            matched_ref_id = bib_by_doi[doi]
+                    # Skip internal sources
+                    if is_internal_source(val):
+                        continue
 
-                # Check URL
-                if not matched:
-                    val_lower = val.lower()
-                    if val_lower in bib_by_url:
-                        matched = True
-                        matched_ref_id = bib_by_url[val_lower]
-
-                if not matched:
-                    # Categorize the unmapped source
-                    category = 'unknown'
-                    if val.count('http') > 1 or (val.count(' ') > 3 and 'http' in val):
-                        category = 'multi_url'
-                    elif 'doi:' in val.lower() or ('10.' in val and 'http' not in val.lower()):
-                        category = 'doi_format_issue'
-                    elif 'http' in val.lower():
-                        category = 'url_not_in_bib'
-                    else:
-                        category = 'text_reference'
+                    # Match by DOI, then by URL
+                    if '10.' in val:
+                        doi_match = _DOI_RE.search(val)
+                        if doi_match and doi_match.group(1).rstrip('.,;').lower() in bib_dois:
+                            continue
+                    if val_lower in bib_urls:
+                        continue
 
                     unmapped.append({
-                        'file': str(tsv_file.relative_to(DATA_DIR)),
+                        'file': rel_path,
                         'row': row_num,
                         'column': col_name,
                         'value': val[:200],  # Truncate long values
-                        'category': category
+                        'category': categorize_unmapped_source(val)
                     })
+    except Exception:
+        return []
+
+    return unmapped
+
+
+def find_unmapped_sources(bibliography):
+    """
+    Find source values in TSV files that don't have bibliography entries.
+    """
+    # Only membership matters for unmapped sources, so sets suffice
+    references = bibliography['references']
+    bib_dois = frozenset(e['DOI'].lower() for e in references if 'DOI' in e)
+    bib_urls = frozenset(e['URL'].lower() for e in references if 'URL' in e)
+
+    unmapped = []
+    for tsv_file in list_tsv_files():
+        if 'references' in str(tsv_file):
+            continue
+        unmapped.extend(_scan_one(tsv_file, bib_dois, bib_urls))
 
     return unmapped
 
@@ -351,6 +379,9 @@ def main():
                         help='Generate unmapped_sources.json')
     args = parser.parse_args()
 
+    # One timestamp for both reports written by this run
+    run_ts = datetime.now().isoformat()
+
     print("=" * 60)
     print("Backfill ref_id Columns from Extraction Audit")
     print("=" * 60)
@@ -383,13 +414,15 @@ def main():
         'supporting_refs_added': 0
     }
 
+    # Index TSV files by name once; the audit only records bare filenames,
+    # so the first match wins when two directories share a filename
+    tsv_index = {}
+    for potential_path in list_tsv_files():
+        tsv_index.setdefault(potential_path.name, potential_path)
+
     for filename, extractions_by_row in by_file.items():
         # Find the actual file path
-        tsv_path = None
-        for potential_path in DATA_DIR.rglob('*.tsv'):
-            if potential_path.name == filename:
-                tsv_path = potential_path
-                break
+        tsv_path = tsv_index.get(filename)
 
         if tsv_path is None:
             results.append({
@@ -444,13 +477,12 @@ def main():
     if args.report:
         report_path = REFERENCES_DIR / 'backfill_report.json'
         report = {
-            '_generated': datetime.now().isoformat(),
+            '_generated': run_ts,
             '_dry_run': args.dry_run,
             'stats': stats,
             'results': results
         }
-        with open(report_path, 'w') as f:
-            json.dump(report, f, indent=2)
+        dump_json(report, report_path)
         print(f"\nDetailed report saved to: {report_path}")
 
     # Handle unmapped sources report
@@ -471,7 +503,7 @@ def main():
             print(f"  {cat}: {len(items)}")
 
         output = {
-            '_generated': datetime.now().isoformat(),
+            '_generated': run_ts,
             '_description': 'TSV source values that could not be matched to bibliography entries',
             'summary': {
                 'total': len(unmapped),
@@ -480,8 +512,7 @@ def main():
             'unmapped': unmapped
         }
 
-        with open(UNMAPPED_OUTPUT, 'w') as f:
-            json.dump(output, f, indent=2)
+        dump_json(output, UNMAPPED_OUTPUT)
 
         print(f"\nUnmapped sources saved to: {UNMAPPED_OUTPUT}")
 
@@ -11,9 +11,14 @@ Run from repository root:
 """
 
 import json
+import os
 import shutil
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from paths import CACHE_DIR, file_stat_key, list_tsv_files, load_cache, load_json, save_cache
+
 # Repository paths
 REPO_ROOT = Path(__file__).parent.parent.resolve()
 DATA_DIR = REPO_ROOT / "data"
@@ -23,6 +28,20 @@ DIST_DATA_DIR = REPO_ROOT / "dist" / "data"
 DIST_REFERENCES_DIR = REPO_ROOT / "dist" / "references"
 OUTPUT_METADATA = DIST_DATA_DIR / "_metadata.json"
 
+# Incremental build cache for _metadata.json dataset entries (not committed)
+METADATA_CACHE = CACHE_DIR / "metadata_cache.json"
+METADATA_CACHE_VERSION = 1
+
+# Row counts at or above this are displayed as "100+"
+ROW_COUNT_CAP = 100
+
+# Display buckets for format_row_count (ascending thresholds)
+ROW_COUNT_THRESHOLDS = (10, 20, 30, 50, ROW_COUNT_CAP)
+ROW_COUNT_LABELS = tuple(f"{t}+" for t in ROW_COUNT_THRESHOLDS)
+
+# Parallel file copies (copy syscalls release the GIL)
+COPY_WORKERS = 8
+
 # Category configuration - maps directory names to display info
 CATEGORIES = {
     "simulations": {
@@ -83,34 +102,63 @@ CATEGORIES = {
 }
 
 
-def read_tsv_headers(tsv_path: Path) -> list[str]:
-    """Read column headers from a TSV file."""
-    with open(tsv_path, 'r', encoding='utf-8') as f:
-        header_line = f.readline().strip()
-        return header_line.split('\t')
-
+def read_tsv_header_and_count(tsv_path: Path) -> tuple[list[str], int]:
+    """
+    Read column headers and count non-empty data rows in one pass.
 
-def count_tsv_rows(tsv_path: Path) -> int:
-    """Count data rows in a TSV file (excluding header)."""
-    with open(tsv_path, 'r', encoding='utf-8') as f:
-        lines = [l for l in f.readlines() if l.strip()]
-        return max(0, len(lines) - 1)  # Exclude header
+    Counting stops at ROW_COUNT_CAP, since format_row_count shows anything
+    beyond it as "100+". Rows are scanned as bytes to skip UTF-8 decoding.
+    """
+    with open(tsv_path, 'rb', buffering=1 << 16) as f:
+        header = f.readline().decode('utf-8').strip().split('\t')
+        row_count = 0
+        for line in f:
+            if line.strip():
+                row_count += 1
+                if row_count >= ROW_COUNT_CAP:
+                    break
+    return header, row_count
 
 
 def format_row_count(count: int) -> str:
     """Format row count for display."""
-    if count >= 100:
-        return "100+"
-    elif count >= 50:
-        return "50+"
-    elif count >= 30:
-        return "30+"
-    elif count >= 20:
-        return "20+"
-    elif count >= 10:
-        return "10+"
-    else:
-        return str(count)
+    bucket = bisect_right(ROW_COUNT_THRESHOLDS, count)
+    return ROW_COUNT_LABELS[bucket - 1] if bucket else str(count)
+
+
+def copy_file(src: Path, dest: Path) -> None:
+    """
+    Copy a file with its metadata, like shutil.copy2.
+
+    Uses os.copy_file_range where available so the kernel can copy (or
+    reflink) without moving bytes through userspace.
+    """
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, 'rb') as fsrc, open(dest, 'wb') as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            shutil.copystat(src, dest)
+            return
+        except OSError:
+            pass  # e.g. unsupported filesystem; fall back below
+
+    shutil.copy2(src, dest)
+
+
+def is_up_to_date(src: Path, dest: Path) -> bool:
+    """Check whether dest is a previous copy of src (same size and mtime)."""
+    try:
+        src_stat = src.stat()
+        dest_stat = dest.stat()
+    except FileNotFoundError:
+        return False
+    return (src_stat.st_size == dest_stat.st_size
+            and src_stat.st_mtime_ns == dest_stat.st_mtime_ns)
 
 
 def copy_data_files() -> dict[str, list[Path]]:
@@ -119,12 +167,10 @@ def copy_data_files() -> dict[str, list[Path]]:
     Returns a dict mapping category -> list of copied files.
     """
     copied_files: dict[str, list[Path]] = {}
+    copies: list[tuple[Path, Path]] = []
 
     # Get all TSV files, excluding _metadata directory
-    for tsv_file in DATA_DIR.rglob("*.tsv"):
-        if "_metadata" in tsv_file.parts:
-            continue
-
+    for tsv_file in list_tsv_files():
         # Get relative path from data/
         rel_path = tsv_file.relative_to(DATA_DIR)
         category = rel_path.parts[0]
@@ -132,15 +178,18 @@ def copy_data_files() -> dict[str, list[Path]]:
         # Create destination path
         dest_path = DIST_DATA_DIR / rel_path
         dest_path.parent.mkdir(parents=True, exist_ok=True)
-
-        # Copy file
-        shutil.copy2(tsv_file, dest_path)
+        if not is_up_to_date(tsv_file, dest_path):
+            copies.append((tsv_file, dest_path))
 
         # Track by category
         if category not in copied_files:
             copied_files[category] = []
         copied_files[category].append(dest_path)
 
+    # Copy changed files
+    with ThreadPoolExecutor(max_workers=COPY_WORKERS) as executor:
+        list(executor.map(lambda pair: copy_file(*pair), copies))
+
     return copied_files
 
 
@@ -149,8 +198,7 @@ def load_metadata(category: str, filename: str) -> dict | None:
     # Try exact path first
     metadata_path = METADATA_DIR / category / f"{Path(filename).stem}.json"
     if metadata_path.exists():
-        with open(metadata_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return load_json(metadata_path)
     return None
 
 
@@ -163,8 +211,7 @@ def generate_dataset_entry(tsv_path: Path, category: str) -> dict:
     metadata = load_metadata(category, filename)
 
     # Read TSV info
-    columns = read_tsv_headers(tsv_path)
-    row_count = count_tsv_rows(tsv_path)
+    columns, row_count = read_tsv_header_and_count(tsv_path)
 
     # Build entry
     entry = {
@@ -187,9 +234,31 @@ def generate_dataset_entry(tsv_path: Path, category: str) -> dict:
     return entry
 
 
-def build_metadata(copied_files: dict[str, list[Path]]) -> dict:
-    """Build the consolidated _metadata.json structure."""
+def dataset_cache_key(tsv_path: Path, category: str) -> str:
+    """
+    Build a cache key from the size and mtime of a TSV file and its metadata.
+
+    Copies keep the source mtime (copystat), so an unchanged source file
+    maps to the same key across runs.
+    """
+    metadata_path = METADATA_DIR / category / f"{tsv_path.stem}.json"
+    try:
+        metadata_key = file_stat_key(metadata_path)
+    except FileNotFoundError:
+        metadata_key = "-"
+    rel_path = tsv_path.relative_to(DIST_DATA_DIR).as_posix()
+    return f"{rel_path}:{file_stat_key(tsv_path)}:{metadata_key}"
+
+
+def build_metadata(copied_files: dict[str, list[Path]], cache: dict[str, dict] | None = None) -> dict:
+    """
+    Build the consolidated _metadata.json structure.
+
+    If a cache dict is given, entries for unchanged datasets are reused from
+    it, and on return it holds exactly the entries used in this build.
+    """
     categories = []
+    used_entries: dict[str, dict] = {}
 
     for category_id, category_info in CATEGORIES.items():
         if category_id not in copied_files:
@@ -197,7 +266,12 @@ def build_metadata(copied_files: dict[str, list[Path]]) -> dict:
 
         datasets = []
         for tsv_path in sorted(copied_files[category_id]):
-            entry = generate_dataset_entry(tsv_path, category_id)
+            if cache is None:
+                entry = generate_dataset_entry(tsv_path, category_id)
+            else:
+                key = dataset_cache_key(tsv_path, category_id)
+                entry = cache.get(key) or generate_dataset_entry(tsv_path, category_id)
+                used_entries[key] = entry
             datasets.append(entry)
 
         if datasets:
@@ -209,6 +283,10 @@ def build_metadata(copied_files: dict[str, list[Path]]) -> dict:
                 "datasets": datasets,
             })
 
+    if cache is not None:
+        cache.clear()
+        cache.update(used_entries)
+
     return {
         "categories": categories,
         "github": {
@@ -261,8 +339,11 @@ def main():
 
     # Generate metadata
     print("Generating _metadata.json...")
-    metadata = build_metadata(copied_files)
+    cache = load_cache(METADATA_CACHE, METADATA_CACHE_VERSION)
+    metadata = build_metadata(copied_files, cache)
+    save_cache(METADATA_CACHE, METADATA_CACHE_VERSION, cache)
 
+    # Written with stdlib json: its ASCII escaping is what CI diffs against
     with open(OUTPUT_METADATA, 'w', encoding='utf-8') as f:
         json.dump(metadata, f, indent=2)
 
@@ -5,12 +5,20 @@ Provides unified access to TSV parameter files for both Python figure
 generation and cross-referencing with the TypeScript calculator.
 
 All canonical data lives in data/ subdirectories and is read from TSV files.
+
+The load_*/get_* loaders are memoized: each TSV is parsed once per process
+and every caller receives the same dict, so callers must not mutate the
+returned data (copy it first if needed).
 """
 
 import csv
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+import numpy as np
+import pandas as pd
+
 # Data directories (relative to repo root)
 REPO_ROOT = Path(__file__).parent.parent.resolve()
 DATA_DIR = REPO_ROOT / "data"
@@ -23,6 +31,48 @@ def load_tsv(filepath: Path) -> list[dict]:
         return list(reader)
 
 
+def load_tsv_frame(filepath: Path) -> pd.DataFrame:
+    """
+    Load a well-formed TSV file as a DataFrame of strings.
+
+    Parsing happens in pandas' C engine, so numeric loaders can convert
+    whole columns at once instead of building a dict per row. Missing
+    cells are empty strings. Unlike load_tsv, rows wider than the header
+    are an error.
+    """
+    return pd.read_csv(filepath, sep='\t', dtype=str, index_col=False,
+                       keep_default_na=False, na_filter=False)
+
+
+@lru_cache(maxsize=None)
+def load_organism_columns() -> Dict[str, np.ndarray]:
+    """
+    Load organisms from canonical TSV file as columns.
+
+    Returns dict of read-only arrays aligned by row:
+        - id, name, source: str (object arrays)
+        - neurons: Neuron count (int64)
+        - volume_mm3: Brain volume in mm³ (float64)
+        - synapses: Synapse count (float64)
+    """
+    filepath = DATA_DIR / "organisms" / "organisms.tsv"
+    df = load_tsv_frame(filepath)
+
+    columns = {
+        'id': df['id'].to_numpy(dtype=object),
+        'name': df['name'].to_numpy(dtype=object),
+        'neurons': df['neurons'].astype(float).to_numpy().astype(np.int64),
+        'volume_mm3': df['volume_mm3'].astype(float).to_numpy(),
+        'synapses': df['synapses'].astype(float).to_numpy(),
+        'source': (df['source'].to_numpy(dtype=object) if 'source' in df
+                   else np.full(len(df), '', dtype=object)),
+    }
+    for array in columns.values():
+        array.flags.writeable = False
+    return columns
+
+
+@lru_cache(maxsize=None)
 def load_organisms() -> Dict[str, Dict[str, Any]]:
     """
     Load organisms from canonical TSV file.
@@ -33,22 +83,31 @@ def load_organisms() -> Dict[str, Dict[str, Any]]:
         - volume_mm3: Brain volume in mm³ (float)
         - synapses: Synapse count (float)
         - source: Data source reference
+
+    Built from load_organism_columns; use that directly for vectorized work.
     """
-    filepath = DATA_DIR / "organisms" / "organisms.tsv"
-    rows = load_tsv(filepath)
+    columns = load_organism_columns()
 
-    organisms = {}
-    for row in rows:
-        organisms[row['id']] = {
-            'name': row['name'],
-            'neurons': int(float(row['neurons'])),
-            'volume_mm3': float(row['volume_mm3']),
-            'synapses': float(row['synapses']),
-            'source': row.get('source', ''),
+    return {
+        org_id: {
+            'name': name,
+            'neurons': neurons,
+            'volume_mm3': volume_mm3,
+            'synapses': synapses,
+            'source': source,
         }
-    return organisms
+        for org_id, name, neurons, volume_mm3, synapses, source in zip(
+            columns['id'].tolist(),
+            columns['name'].tolist(),
+            columns['neurons'].tolist(),
+            columns['volume_mm3'].tolist(),
+            columns['synapses'].tolist(),
+            columns['source'].tolist(),
+        )
+    }
 
 
+@lru_cache(maxsize=None)
 def get_species_neurons() -> Dict[str, int]:
     """
     Get neuron counts formatted for figure annotations.
@@ -74,6 +133,7 @@ def get_species_neurons() -> Dict[str, int]:
     }
 
 
+@lru_cache(maxsize=None)
 def get_compute_requirements() -> Dict[str, float]:
     """
     Get compute requirements in petaFLOPS by organism.
@@ -83,14 +143,12 @@ def get_compute_requirements() -> Dict[str, float]:
     Returns dict with display names as keys.
     """
     filepath = DATA_DIR / "compute" / "compute-requirements.tsv"
-    rows = load_tsv(filepath)
+    df = load_tsv_frame(filepath)
 
-    return {
-        row['name']: float(row['compute_pflops'])
-        for row in rows
-    }
+    return dict(zip(df['name'], df['compute_pflops'].astype(float).tolist()))
 
 
+@lru_cache(maxsize=None)
 def get_storage_requirements() -> Dict[str, float]:
     """
     Get storage requirements in TB by organism.
@@ -100,14 +158,12 @@ def get_storage_requirements() -> Dict[str, float]:
     Returns dict with display names as keys.
     """
     filepath = DATA_DIR / "compute" / "storage-requirements.tsv"
-    rows = load_tsv(filepath)
+    df = load_tsv_frame(filepath)
 
-    return {
-        row['name']: float(row['storage_tb'])
-        for row in rows
-    }
+    return dict(zip(df['name'], df['storage_tb'].astype(float).tolist()))
 
 
+@lru_cache(maxsize=None)
 def load_imaging_modalities() -> Dict[str, Dict[str, Any]]:
     """
     Load imaging modality parameters from TSV.
@@ -128,6 +184,7 @@ def load_imaging_modalities() -> Dict[str, Dict[str, Any]]:
     return modalities
 
 
+@lru_cache(maxsize=None)
 def load_formulas(formula_type: str) -> Dict[str, Dict[str, Any]]:
     """
     Load formulas from TSV file.
@@ -151,6 +208,7 @@ def load_formulas(formula_type: str) -> Dict[str, Dict[str, Any]]:
     return formulas
 
 
+@lru_cache(maxsize=None)
 def load_shared_params() -> Dict[str, Dict[str, Any]]:
     """
     Load shared project parameters from TSV.
@@ -10,45 +10,59 @@ Note: Many "orphaned" entries ARE actually referenced via source/DOI columns
 in the original data. This script identifies both categories.
 """
 
+import hashlib
 import json
+import os
 import re
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from datetime import datetime
 
-# Paths
-REPO_ROOT = Path(__file__).parent.parent
-DATA_DIR = REPO_ROOT / "data"
-BIB_PATH = DATA_DIR / "references" / "bibliography.json"
-OUTPUT_PATH = DATA_DIR / "references" / "orphaned_entries.json"
+from paths import (
+    CACHE_DIR, DATA_DIR, DATA_REFERENCES, dump_json, file_stat_key,
+    list_tsv_files, load_bibliography_cached, load_cache, save_cache,
+)
 
+# Paths (resolved in paths.py, matching the files list_tsv_files yields)
+OUTPUT_PATH = DATA_REFERENCES / "orphaned_entries.json"
 
-def load_bibliography():
-    """Load the bibliography JSON."""
-    with open(BIB_PATH) as f:
-        return json.load(f)
+# Per-file scan results, reused while a TSV's size and mtime are unchanged
+TSV_REFS_CACHE = CACHE_DIR / "tsv_refs.json"
+TSV_REFS_CACHE_VERSION = 2
 
+# Compiled once; extracts the DOI from source cells
+DOI_RE = re.compile(r'(10\.\d{4,}/[^\s]+)')
 
-def get_used_ref_ids():
-    """Get all ref_ids used in TSV files (ref_id and supporting_refs columns)."""
-    used_ids = set()
 
-    for tsv_file in DATA_DIR.rglob('*.tsv'):
-        try:
-            with open(tsv_file, 'r') as f:
-                lines = f.readlines()
+def _scan_one(tsv_file, bib_by_doi, bib_by_url):
+    """Return (used_ids, matched_ids) for a single TSV file, or None on error."""
+    used_ids = set()
+    matched_ids = set()
 
-            if not lines:
-                continue
+    try:
+        with open(tsv_file, 'r', encoding='utf-8') as f:
+            header_line = next(f, None)
+            if header_line is None:
+                return used_ids, matched_ids
 
-            header = lines[0].strip().split('\t')
+            header = header_line.strip().split('\t')
             ref_id_col = header.index('ref_id') if 'ref_id' in header else None
             supporting_refs_col = header.index('supporting_refs') if 'supporting_refs' in header else None
+            # Find source-like columns
+            source_cols = []
+            for i, col in enumerate(header):
+                if col.lower() in ['source', 'doi', 'link', 'references', 'ref', 'url']:
+                    source_cols.append(i)
+
+            if ref_id_col is None and supporting_refs_col is None and not source_cols:
+                return used_ids, matched_ids
 
-            if ref_id_col is None and supporting_refs_col is None:
-                continue
+            # Split each row only as far as the last column the scan reads;
+            # cells are stripped individually below
+            max_col = max(i for i in (ref_id_col, supporting_refs_col, *source_cols) if i is not None)
 
-            for line in lines[1:]:
-                cols = line.strip().split('\t')
+            for line in f:
+                cols = line.split('\t', max_col + 1)
 
                 if ref_id_col is not None and ref_id_col < len(cols):
                     ref = cols[ref_id_col].strip()
@@ -62,18 +76,30 @@ def get_used_ref_ids():
                             r = r.strip()
                             if r and r != 'none' and not r.startswith('internal_'):
                                 used_ids.add(r)
-        except Exception as e:
-            print(f"Error processing {tsv_file}: {e}")
 
-    return used_ids
+                for col_idx in source_cols:
+                    if col_idx < len(cols):
+                        val = cols[col_idx].strip().lower()
+                        if val:
+                            # Check if it's a DOI
+                            if '10.' in val:
+                                doi_match = DOI_RE.search(val)
+                                if doi_match:
+                                    doi = doi_match.group(0).rstrip('.,;')
+                                    if doi in bib_by_doi:
+                                        matched_ids.add(bib_by_doi[doi])
+                            # Check if it matches a URL
+                            if val in bib_by_url:
+                                matched_ids.add(bib_by_url[val])
+    except Exception as e:
+        print(f"Error processing {tsv_file}: {e}")
+        return None
 
+    return used_ids, matched_ids
 
-def get_source_column_refs(bib_entries):
-    """
-    Check which bibliography entries are referenced via source/DOI columns.
-    Returns a set of ref_ids that are matched.
-    """
-    # Build lookup indices
+
+def build_bib_indices(bib_entries):
+    """Build (bib_by_doi, bib_by_url) lookups from lowercased DOI/URL to ref_id."""
     bib_by_doi = {}
     bib_by_url = {}
     for entry in bib_entries:
@@ -82,47 +108,66 @@ def get_source_column_refs(bib_entries):
             bib_by_doi[entry['DOI'].lower()] = ref_id
         if 'URL' in entry:
             bib_by_url[entry['URL'].lower()] = ref_id
+    return bib_by_doi, bib_by_url
 
-    matched_ids = set()
-
-    for tsv_file in DATA_DIR.rglob('*.tsv'):
-        try:
-            with open(tsv_file, 'r') as f:
-                lines = f.readlines()
 
-            if not lines:
-                continue
+def bib_indices_key(bib_by_doi, bib_by_url):
+    """
+    Build the TSV refs cache key from the DOI/URL lookups the scan matches
+    against, so cached matches always belong to the bibliography in use.
+    """
+    digest = hashlib.sha256()
+    for index in (bib_by_doi, bib_by_url):
+        digest.update(json.dumps(sorted(index.items())).encode('utf-8'))
+    return digest.hexdigest()
 
-            header = lines[0].strip().split('\t')
-            # Find source-like columns
-            source_cols = []
-            for i, col in enumerate(header):
-                if col.lower() in ['source', 'doi', 'link', 'references', 'ref', 'url']:
-                    source_cols.append(i)
 
-            if not source_cols:
-                continue
+def scan_all_tsvs(bib_by_doi, bib_by_url, cache=None):
+    """
+    Scan every TSV file once for bibliography usage.
 
-            for line in lines[1:]:
-                cols = line.strip().split('\t')
-                for col_idx in source_cols:
-                    if col_idx < len(cols):
-                        val = cols[col_idx].strip().lower()
-                        if val:
-                            # Check if it's a DOI
-                            if '10.' in val:
-                                doi_match = re.search(r'10\.\d{4,}/[^\s]+', val)
-                                if doi_match:
-                                    doi = doi_match.group(0).rstrip('.,;')
-                                    if doi in bib_by_doi:
-                                        matched_ids.add(bib_by_doi[doi])
-                            # Check if it matches a URL
-                            if val in bib_by_url:
-                                matched_ids.add(bib_by_url[val])
-        except Exception as e:
-            pass
+    bib_by_doi and bib_by_url come from build_bib_indices. Returns
+    (used_ids, matched_ids): ref_ids used in ref_id/supporting_refs
+    columns, and ref_ids whose DOI or URL appears in a source-like column.
+    Files are independent, so they are scanned in a thread pool and the
+    per-file sets merged.
 
-    return matched_ids
+    If a cache dict is given, results for files whose size and mtime are
+    unchanged are reused from it, and on return it holds exactly the
+    entries for the files scanned this run.
+    """
+    used_ids = set()
+    matched_ids = set()
+    entries = {}
+    pending = []
+
+    for tsv_file in list_tsv_files():
+        rel_path = tsv_file.relative_to(DATA_DIR).as_posix()
+        key = file_stat_key(tsv_file)
+        cached = cache.get(rel_path) if cache else None
+        if cached is not None and cached['key'] == key:
+            used_ids.update(cached['used'])
+            matched_ids.update(cached['matched'])
+            entries[rel_path] = cached
+        else:
+            pending.append((tsv_file, rel_path, key))
+
+    scan = partial(_scan_one, bib_by_doi=bib_by_doi, bib_by_url=bib_by_url)
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = executor.map(scan, [tsv_file for tsv_file, _, _ in pending])
+        for (_, rel_path, key), result in zip(pending, results):
+            if result is None:
+                continue  # Unreadable; rescan next run
+            file_used, file_matched = result
+            used_ids |= file_used
+            matched_ids |= file_matched
+            entries[rel_path] = {'key': key, 'used': sorted(file_used), 'matched': sorted(file_matched)}
+
+    if cache is not None:
+        cache.clear()
+        cache.update(entries)
+
+    return used_ids, matched_ids
 
 
 def main():
@@ -130,25 +175,27 @@ def main():
     print("Export Orphaned Bibliography Entries")
     print("=" * 60)
 
+    # One timestamp for everything this run writes
+    run_ts = datetime.now().isoformat()
+
     # Load bibliography
     print("\nLoading bibliography...")
-    bib = load_bibliography()
-    all_ids = {e['id'] for e in bib['references']}
+    bib, all_ids = load_bibliography_cached()
     print(f"  Total entries: {len(all_ids)}")
 
-    # Get used ref_ids
-    print("\nScanning TSV files for ref_id usage...")
-    used_via_ref_id = get_used_ref_ids()
+    # Get used ref_ids and source column matches in one pass
+    print("\nScanning TSV files for ref_id usage and source/DOI matches...")
+    bib_by_doi, bib_by_url = build_bib_indices(bib['references'])
+    bib_key = bib_indices_key(bib_by_doi, bib_by_url)
+    cache = load_cache(TSV_REFS_CACHE, TSV_REFS_CACHE_VERSION, bib_key)
+    used_via_ref_id, used_via_source = scan_all_tsvs(bib_by_doi, bib_by_url, cache)
+    save_cache(TSV_REFS_CACHE, TSV_REFS_CACHE_VERSION, cache, bib_key)
     print(f"  Used via ref_id/supporting_refs: {len(used_via_ref_id)}")
-
-    # Get source column matches
-    print("\nScanning TSV files for source/DOI matches...")
-    used_via_source = get_source_column_refs(bib['references'])
     print(f"  Matched via source/DOI columns: {len(used_via_source)}")
 
     # Calculate categories
     all_used = used_via_ref_id | used_via_source
-    truly_orphaned = all_ids - all_used
+    truly_orphaned = frozenset(all_ids - all_used)
     referenced_via_source_only = used_via_source - used_via_ref_id
 
     print(f"\nSummary:")
@@ -159,7 +206,7 @@ def main():
 
     # Build output structure
     output = {
-        "_generated": datetime.now().isoformat(),
+        "_generated": run_ts,
         "_description": "Orphaned bibliography entries for investigation",
         "_note": "These entries are in bibliography.json but may not be actively referenced",
         "summary": {
@@ -168,19 +215,18 @@ def main():
             "used_via_source_doi_column_only": len(referenced_via_source_only),
             "truly_orphaned": len(truly_orphaned)
         },
-        "truly_orphaned": sorted(list(truly_orphaned)),
-        "referenced_via_source_only": sorted(list(referenced_via_source_only)),
-        "entries": {}
+        "truly_orphaned": sorted(truly_orphaned),
+        "referenced_via_source_only": sorted(referenced_via_source_only),
+        # Full entry details for truly orphaned, in bibliography order
+        "entries": {
+            entry['id']: entry
+            for entry in bib['references']
+            if entry['id'] in truly_orphaned
+        }
     }
 
-    # Add full entry details for truly orphaned
-    for entry in bib['references']:
-        if entry['id'] in truly_orphaned:
-            output['entries'][entry['id']] = entry
-
     # Save output
-    with open(OUTPUT_PATH, 'w') as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    dump_json(output, OUTPUT_PATH)
 
     print(f"\nSaved orphaned entries to: {OUTPUT_PATH}")
     print(f"  - {len(truly_orphaned)} truly orphaned entries (with full details)")
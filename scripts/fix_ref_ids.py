@@ -9,15 +9,22 @@ This script:
 4. Validates all ref_ids exist in bibliography
 """
 
-import json
+import os
 import re
-from pathlib import Path
+import shutil
+import tempfile
 from datetime import datetime
 
+from paths import DATA_FILES, dump_json, list_tsv_files, load_bibliography_cached
+
 # Paths
-REPO_ROOT = Path(__file__).parent.parent
-DATA_DIR = REPO_ROOT / "data"
-BIB_PATH = DATA_DIR / "references" / "bibliography.json"
+BIB_PATH = DATA_FILES["bibliography"]
+
+# ref_note text for known internal_* ref_ids; others use derive_internal_note
+INTERNAL_NOTE = {
+    'internal_estimate_2025': 'Internal estimate',
+    'internal_methodology_2025': 'Internal methodology',
+}
 
 # References to add to bibliography
 NEW_REFERENCES = [
@@ -114,116 +121,142 @@ NEW_REFERENCES = [
 ]
 
 
-def load_bibliography():
-    """Load the bibliography JSON."""
-    with open(BIB_PATH) as f:
-        return json.load(f)
-
+def save_bibliography(bib, generated=None):
+    """
+    Save the bibliography JSON.
 
-def save_bibliography(bib):
-    """Save the bibliography JSON."""
-    bib["_generated"] = datetime.now().isoformat()
-    with open(BIB_PATH, "w") as f:
-        json.dump(bib, f, indent=2, ensure_ascii=False)
+    generated is the run timestamp stored in _generated (default: now).
+    """
+    bib["_generated"] = generated or datetime.now().isoformat()
+    dump_json(bib, BIB_PATH)
+    # Later loads in this process must see the file just written
+    load_bibliography_cached.cache_clear()
     print(f"Saved bibliography to {BIB_PATH}")
 
 
-def add_missing_references(bib):
-    """Add missing references to bibliography."""
-    existing_ids = {e["id"] for e in bib["references"]}
+def add_missing_references(bib, bib_ids):
+    """
+    Add missing references to bibliography.
+
+    bib_ids is the set of ids already in bib; added ids are inserted into it.
+    """
     added = []
 
     for ref in NEW_REFERENCES:
-        if ref["id"] not in existing_ids:
+        if ref["id"] not in bib_ids:
             bib["references"].append(ref)
+            bib_ids.add(ref["id"])
             added.append(ref["id"])
             print(f"  Added: {ref['id']}")
 
     return added
 
 
+def derive_internal_note(ref_id):
+    """Derive a ref_note from an internal_* ref_id not listed in INTERNAL_NOTE."""
+    note_text = ref_id.replace('internal_', '').replace('_', ' ').replace('2025', '').strip().capitalize()
+    if note_text == 'Estimate':
+        note_text = 'Internal estimate'
+    elif note_text == 'Methodology':
+        note_text = 'Internal methodology'
+    return note_text
+
+
 def fix_tsv_file(filepath, bib_ids, dry_run=True):
-    """Fix ref_id issues in a single TSV file."""
-    changes = []
+    """
+    Fix ref_id issues in a single TSV file.
 
-    with open(filepath, 'r') as f:
-        lines = f.readlines()
-
-    if not lines:
-        return changes
-
-    header = lines[0].strip().split('\t')
-    if 'ref_id' not in header:
-        return changes
-
-    ref_id_col = header.index('ref_id')
-    ref_note_col = header.index('ref_note') if 'ref_note' in header else None
-
-    new_lines = [lines[0]]  # Keep header
-
-    for row_num, line in enumerate(lines[1:], start=2):
-        cols = line.rstrip('\n').split('\t')
-
-        # Ensure we have enough columns
-        while len(cols) <= max(ref_id_col, ref_note_col or 0):
-            cols.append('')
-
-        original_ref_id = cols[ref_id_col]
-        ref_id = original_ref_id.strip()
-
-        # Fix 1: Replace "none" with empty
-        if ref_id == 'none':
-            cols[ref_id_col] = ''
-            changes.append({
-                'file': str(filepath),
-                'row': row_num,
-                'change': 'Replaced "none" with empty',
-                'before': original_ref_id,
-                'after': ''
-            })
-
-        # Fix 2: Move internal_* to ref_note
-        elif ref_id.startswith('internal_'):
-            cols[ref_id_col] = ''
-            if ref_note_col is not None:
-                existing_note = cols[ref_note_col].strip()
-                # Convert internal_estimate_2025 -> "Internal estimate"
-                # Convert internal_methodology_2025 -> "Internal methodology"
-                note_text = ref_id.replace('internal_', '').replace('_', ' ').replace('2025', '').strip().capitalize()
-                if note_text == 'Estimate':
-                    note_text = 'Internal estimate'
-                elif note_text == 'Methodology':
-                    note_text = 'Internal methodology'
-
-                if existing_note:
-                    cols[ref_note_col] = f"{existing_note}; {note_text}"
-                else:
-                    cols[ref_note_col] = note_text
-
-                changes.append({
-                    'file': str(filepath),
-                    'row': row_num,
-                    'change': f'Moved to ref_note',
-                    'before': original_ref_id,
-                    'after': f'ref_id="", ref_note="{cols[ref_note_col]}"'
-                })
-
-        # Fix 3: Validate ref_id exists in bibliography
-        elif ref_id and ref_id not in bib_ids:
-            changes.append({
-                'file': str(filepath),
-                'row': row_num,
-                'change': 'WARNING: ref_id not in bibliography',
-                'before': original_ref_id,
-                'after': '(needs manual fix or bibliography addition)'
-            })
-
-        new_lines.append('\t'.join(cols) + '\n')
-
-    if not dry_run and changes:
-        with open(filepath, 'w') as f:
-            f.writelines(new_lines)
-        print(f"  Updated: {filepath}")
+    Lines are streamed from the input; when applying, fixed lines go to a
+    temporary file in the same directory, which replaces the original only
+    if something changed.
+    """
+    changes = []
+    tmp = None
+
+    try:
+        with open(filepath, 'r') as f:
+            header_line = next(f, None)
+            if header_line is None:
+                return changes
+
+            header = header_line.strip().split('\t')
+            if 'ref_id' not in header:
+                return changes
+
+            ref_id_col = header.index('ref_id')
+            ref_note_col = header.index('ref_note') if 'ref_note' in header else None
+
+            if not dry_run:
+                tmp = tempfile.NamedTemporaryFile(
+                    'w', dir=filepath.parent, suffix='.tmp', delete=False)
+                tmp.write(header_line)  # Keep header
+
+            for row_num, line in enumerate(f, start=2):
+                cols = line.rstrip('\n').split('\t')
+
+                # Ensure we have enough columns
+                while len(cols) <= max(ref_id_col, ref_note_col or 0):
+                    cols.append('')
+
+                original_ref_id = cols[ref_id_col]
+                ref_id = original_ref_id.strip()
+
+                # Fix 1: Replace "none" with empty
+                if ref_id == 'none':
+                    cols[ref_id_col] = ''
+                    changes.append({
+                        'file': str(filepath),
+                        'row': row_num,
+                        'change': 'Replaced "none" with empty',
+                        'before': original_ref_id,
+                        'after': ''
+                    })
+
+                # Fix 2: Move internal_* to ref_note
+                elif ref_id.startswith('internal_'):
+                    cols[ref_id_col] = ''
+                    if ref_note_col is not None:
+                        existing_note = cols[ref_note_col].strip()
+                        note_text = INTERNAL_NOTE.get(ref_id) or derive_internal_note(ref_id)
+
+                        if existing_note:
+                            cols[ref_note_col] = f"{existing_note}; {note_text}"
+                        else:
+                            cols[ref_note_col] = note_text
+
+                        changes.append({
+                            'file': str(filepath),
+                            'row': row_num,
+                            'change': f'Moved to ref_note',
+                            'before': original_ref_id,
+                            'after': f'ref_id="", ref_note="{cols[ref_note_col]}"'
+                        })
+
+                # Fix 3: Validate ref_id exists in bibliography
+                elif ref_id and ref_id not in bib_ids:
+                    changes.append({
+                        'file': str(filepath),
+                        'row': row_num,
+                        'change': 'WARNING: ref_id not in bibliography',
+                        'before': original_ref_id,
+                        'after': '(needs manual fix or bibliography addition)'
+                    })
+
+                if tmp is not None:
+                    tmp.write('\t'.join(cols) + '\n')
+
+        if tmp is not None:
+            tmp.close()
+            if changes:
+                shutil.copymode(filepath, tmp.name)
+                os.replace(tmp.name, filepath)
+                tmp = None
+                print(f"  Updated: {filepath}")
+    finally:
+        # Discard the temporary file if nothing changed or on error
+        if tmp is not None:
+            tmp.close()
+            os.unlink(tmp.name)
 
     return changes
 
@@ -235,19 +268,23 @@ def main(dry_run=True):
     print(f"Mode: {'DRY RUN' if dry_run else 'APPLY CHANGES'}")
     print()
 
+    # One timestamp for everything this run writes
+    run_ts = datetime.now().isoformat()
+
     # Load bibliography
     print("Loading bibliography...")
-    bib = load_bibliography()
-    bib_ids = {e["id"] for e in bib["references"]}
+    cached_bib, cached_ids = load_bibliography_cached()
+    # add_missing_references extends the reference list; leave the cache intact
+    bib = {**cached_bib, "references": list(cached_bib["references"])}
+    bib_ids = set(cached_ids)
     print(f"  Found {len(bib_ids)} existing entries")
 
     # Add missing references
     print("\nAdding missing references to bibliography...")
-    added = add_missing_references(bib)
+    added = add_missing_references(bib, bib_ids)
     if added:
-        bib_ids.update(added)
         if not dry_run:
-            save_bibliography(bib)
+            save_bibliography(bib, generated=run_ts)
     else:
         print("  No new references to add")
 
@@ -255,7 +292,7 @@ def main(dry_run=True):
     print("\nProcessing TSV files...")
     all_changes = []
 
-    for tsv_file in DATA_DIR.rglob('*.tsv'):
+    for tsv_file in list_tsv_files():
         if 'external' in str(tsv_file):
             continue
 
@@ -3,9 +3,23 @@ Brain Emulation Report 2025 - Path Configuration
 
 Centralized path definitions for all scripts.
 All paths are absolute and derived from __file__ to work regardless of cwd.
+
+Also provides the stdlib-only helpers shared by the data scripts (TSV file
+listing, bibliography and JSON loading, sidecar caches), so they can run
+without the figure dependencies (numpy, pandas) installed.
 """
 
+import json
+import os
+from functools import lru_cache
 from pathlib import Path
+from typing import Iterator
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 # Repository root (one level up from scripts/)
 REPO_ROOT = Path(__file__).parent.parent.resolve()
@@ -51,6 +65,9 @@ OUTPUT_CALCULATOR_DATA = OUTPUT_CALCULATOR / "data.json"
 OUTPUT_CALCULATOR_TYPES = OUTPUT_CALCULATOR / "types.ts"
 OUTPUT_CALCULATOR_DOCS = OUTPUT_CALCULATOR / "docs"
 
+# Sidecar caches for incremental script runs (not committed)
+CACHE_DIR = REPO_ROOT / ".cache"
+
 # Specific data files (commonly used)
 DATA_FILES = {
     # Simulations
@@ -131,3 +148,100 @@ def ensure_output_dirs():
         OUTPUT_CALCULATOR_DOCS,
     ]:
         dir_path.mkdir(parents=True, exist_ok=True)
+
+
+def iter_tsv_files(root: Path = DATA_DIR) -> Iterator[Path]:
+    """
+    Yield TSV files under root depth-first, in the same order as rglob.
+
+    Walks with os.scandir so file and directory checks are answered from
+    the directory entries without extra stat calls. Symlinked directories
+    are not followed and _metadata/ directories are skipped.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        subdirs = []
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name != '_metadata':
+                        subdirs.append(entry.path)
+                elif entry.name.endswith('.tsv'):
+                    yield Path(entry.path)
+        stack.extend(reversed(subdirs))
+
+
+@lru_cache(maxsize=1)
+def list_tsv_files() -> tuple[Path, ...]:
+    """
+    List all TSV files under data/ (excluding _metadata/).
+
+    The directory walk happens once per process; callers that scan every
+    dataset share the cached result.
+    """
+    return tuple(iter_tsv_files())
+
+
+def load_json(path):
+    """Load a JSON file, using orjson when available."""
+    if HAS_ORJSON:
+        return orjson.loads(Path(path).read_bytes())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def dump_json(data, path):
+    """
+    Write a JSON file with 2-space indent, using orjson when available.
+
+    Both paths emit the same bytes: UTF-8 with non-ASCII left unescaped.
+    """
+    if HAS_ORJSON:
+        Path(path).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+@lru_cache(maxsize=1)
+def load_bibliography_cached() -> tuple[dict, frozenset[str]]:
+    """
+    Load the bibliography JSON once per process.
+
+    Returns (bibliography, ids): the parsed bibliography.json and a frozenset
+    of its entry ids. Callers must not mutate the result; scripts that extend
+    the bibliography must copy it first.
+    """
+    bib = load_json(DATA_FILES["bibliography"])
+    return bib, frozenset(entry['id'] for entry in bib['references'])
+
+
+def file_stat_key(path) -> str:
+    """Build a cache key from a file's size and mtime."""
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def load_cache(path, version, key=None) -> dict:
+    """
+    Load the entries of a sidecar cache under CACHE_DIR.
+
+    Returns an empty cache if the file is missing or unreadable, was written
+    with a different format version, or was built for a different key (e.g.
+    other input data the entries depend on).
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != version or cache.get('key') != key:
+        return {}
+    return cache.get('entries', {})
+
+
+def save_cache(path, version, entries, key=None) -> None:
+    """Write entries to a sidecar cache, tagged with version and key."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': version, 'key': key, 'entries': entries}, f)